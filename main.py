@@ -1,18 +1,12 @@
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-import plotly.figure_factory as ff
-from utils.data_processor import load_and_process_data, generate_summary_stats
+from utils.data_processor import load_and_process_data, generate_summary_stats, filter_mask, top_k_counts
 from utils.visualizations import (
-    plot_ev_by_make, 
-    plot_ev_by_model_year, 
-    plot_ev_by_electric_range, 
-    plot_ev_geographical_distribution,
-    plot_ev_by_electric_type,
-    plot_ev_by_cafv_eligibility,
-    plot_interactive_geographic_heatmap
+    build_all_plots,
+    plot_numeric_distribution,
+    plot_interactive_geographic_heatmap,
+    build_insights
 )
 
 # Page configuration
@@ -78,7 +72,7 @@ with st.spinner("Processing data..."):
     try:
         # Check if we have the dataset in assets
         if os.path.exists(data_path):
-            df = load_and_process_data(data_path)
+            df = load_and_process_data(data_path, os.path.getmtime(data_path))
             st.success(f"Successfully loaded data with {len(df)} records")
         else:
             # Fallback to file upload if dataset doesn't exist in assets
@@ -87,7 +81,7 @@ with st.spinner("Processing data..."):
                 st.warning("Please upload an Electric Vehicle Population dataset CSV file to begin analysis.")
                 st.info("The dashboard expects a CSV file with columns such as Make, Model, Model Year, Electric Range, etc.")
                 st.stop()
-            df = load_and_process_data(uploaded_file)
+            df = load_and_process_data(uploaded_file.getvalue())
             st.success(f"Successfully loaded data from uploaded file with {len(df)} records")
         
         # Save summary stats
@@ -110,7 +104,7 @@ year_range = st.sidebar.slider(
 )
 
 # Make filter
-all_makes = sorted(df['Make'].unique().tolist())
+all_makes = df['Make'].cat.categories.tolist()
 selected_makes = st.sidebar.multiselect(
     "Select Vehicle Makes",
     options=all_makes,
@@ -127,39 +121,41 @@ electric_range = st.sidebar.slider(
     value=(min_range, max_range)
 )
 
-# Apply filters
-filtered_df = df[
-    (df['Model Year'] >= year_range[0]) & 
-    (df['Model Year'] <= year_range[1]) &
-    (df['Make'].isin(selected_makes)) &
-    (df['Electric Range'] >= electric_range[0]) &
-    (df['Electric Range'] <= electric_range[1])
-]
+# Apply filters; sorting the makes lets equivalent selections share a cache entry.
+# The mask is passed down instead of a filtered copy of the frame, so each
+# consumer only materializes the columns it reads
+mask = filter_mask(df, year_range, tuple(sorted(selected_makes)), electric_range)
+filtered_count = int(mask.sum())
 
 # Display count of filtered data
-st.sidebar.info(f"Showing {len(filtered_df)} vehicles out of {len(df)} total")
+st.sidebar.info(f"Showing {filtered_count} vehicles out of {len(df)} total")
 
 # Main dashboard content
-if not filtered_df.empty:
+if filtered_count > 0:
     # Key metrics row
     st.markdown("<h2 class='sub-header'>Key Metrics</h2>", unsafe_allow_html=True)
     
     metrics_col1, metrics_col2, metrics_col3, metrics_col4 = st.columns(4)
     
     with metrics_col1:
-        st.metric("Total EVs", f"{len(filtered_df):,}")
+        st.metric("Total EVs", f"{filtered_count:,}")
     
     with metrics_col2:
-        st.metric("Unique Makes", f"{filtered_df['Make'].nunique():,}")
+        st.metric("Unique Makes", f"{df.loc[mask, 'Make'].nunique():,}")
     
     with metrics_col3:
-        st.metric("Avg Electric Range", f"{filtered_df['Electric Range'].mean():.1f} miles")
+        st.metric("Avg Electric Range", f"{df.loc[mask, 'Electric Range'].mean():.1f} miles")
     
     with metrics_col4:
-        latest_year = filtered_df['Model Year'].max()
-        latest_year_count = len(filtered_df[filtered_df['Model Year'] == latest_year])
+        filtered_years = df.loc[mask, 'Model Year']
+        latest_year = filtered_years.max()
+        latest_year_count = int((filtered_years == latest_year).sum())
         st.metric(f"{latest_year} Models", f"{latest_year_count:,}")
     
+    # Charts sit in expanders that rerun the script when toggled, so figures
+    # are only built for the sections the user has open
+    chart_sections = {}
+    
     # First row of visualizations
     st.markdown("<h2 class='sub-header'>Distribution Analysis</h2>", unsafe_allow_html=True)
     
@@ -167,16 +163,12 @@ if not filtered_df.empty:
     
     with col1:
         st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.subheader("EVs by Manufacturer")
-        fig1 = plot_ev_by_make(filtered_df)
-        st.plotly_chart(fig1, use_container_width=True)
+        chart_sections['make'] = st.expander("EVs by Manufacturer", expanded=True, key="chart_make", on_change="rerun")
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col2:
         st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.subheader("EVs by Model Year")
-        fig2 = plot_ev_by_model_year(filtered_df)
-        st.plotly_chart(fig2, use_container_width=True)
+        chart_sections['model_year'] = st.expander("EVs by Model Year", expanded=True, key="chart_model_year", on_change="rerun")
         st.markdown("</div>", unsafe_allow_html=True)
     
     # Second row of visualizations
@@ -186,16 +178,12 @@ if not filtered_df.empty:
     
     with col3:
         st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.subheader("Electric Range Distribution")
-        fig3 = plot_ev_by_electric_range(filtered_df)
-        st.plotly_chart(fig3, use_container_width=True)
+        chart_sections['electric_range'] = st.expander("Electric Range Distribution", expanded=True, key="chart_electric_range", on_change="rerun")
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col4:
         st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.subheader("EV Type Distribution")
-        fig4 = plot_ev_by_electric_type(filtered_df)
-        st.plotly_chart(fig4, use_container_width=True)
+        chart_sections['ev_type'] = st.expander("EV Type Distribution", expanded=True, key="chart_ev_type", on_change="rerun")
         st.markdown("</div>", unsafe_allow_html=True)
     
     # Third row of visualizations
@@ -205,44 +193,47 @@ if not filtered_df.empty:
     
     with col5:
         st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.subheader("Geographical Distribution")
-        fig5 = plot_ev_geographical_distribution(filtered_df)
-        st.plotly_chart(fig5, use_container_width=True)
+        chart_sections['geo'] = st.expander("Geographical Distribution", expanded=True, key="chart_geo", on_change="rerun")
         st.markdown("</div>", unsafe_allow_html=True)
     
     with col6:
         st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
-        st.subheader("CAFV Eligibility")
-        fig6 = plot_ev_by_cafv_eligibility(filtered_df)
-        st.plotly_chart(fig6, use_container_width=True)
+        chart_sections['cafv'] = st.expander("CAFV Eligibility", expanded=True, key="chart_cafv", on_change="rerun")
         st.markdown("</div>", unsafe_allow_html=True)
     
+    # Build the open charts, then draw each into its section
+    open_charts = [name for name, section in chart_sections.items() if section.open]
+    chart_figures = build_all_plots(df, mask, open_charts)
+    for name in open_charts:
+        with chart_sections[name]:
+            st.plotly_chart(chart_figures[name], use_container_width=True)
+    
     # Data exploration section
     st.markdown("<h2 class='sub-header'>Data Explorer</h2>", unsafe_allow_html=True)
     
     st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
     if st.checkbox("Show raw data"):
-        st.write(filtered_df)
+        st.write(df[mask])
     
     # Column selector for detailed exploration
     explore_col = st.selectbox(
         "Select column to explore distribution:",
-        options=[col for col in filtered_df.columns if col not in ['VIN (1-10)', 'Model']]
+        options=[col for col in df.columns if col not in ['VIN (1-10)', 'Model']]
     )
     
     if explore_col:
         st.subheader(f"Distribution of {explore_col}")
         
         # Different visualization based on column type
-        if filtered_df[explore_col].dtype == 'object':
+        if not pd.api.types.is_numeric_dtype(df[explore_col]):
             # For categorical columns
-            value_counts = filtered_df[explore_col].value_counts().reset_index()
-            value_counts.columns = [explore_col, 'Count']
+            explore_values = df.loc[mask, explore_col]
+            value_counts = top_k_counts(explore_values, k=20)
             
             # Only show top 20 if there are many unique values
-            if len(value_counts) > 20:
-                st.info(f"Showing top 20 out of {len(value_counts)} unique values")
-                value_counts = value_counts.head(20)
+            unique_count = explore_values.nunique()
+            if unique_count > 20:
+                st.info(f"Showing top 20 out of {unique_count} unique values")
             
             import plotly.express as px
             fig = px.bar(
@@ -256,14 +247,10 @@ if not filtered_df.empty:
             st.plotly_chart(fig, use_container_width=True)
         else:
             # For numerical columns
-            import plotly.figure_factory as ff
-            
-            fig = ff.create_distplot(
-                [filtered_df[explore_col].dropna()], 
-                [explore_col],
-                bin_size=[max(1, int((filtered_df[explore_col].max() - filtered_df[explore_col].min()) / 50))]
-            )
-            fig.update_layout(title_text=f'Distribution of {explore_col}')
+            # Bin width from the column's precomputed full-data range
+            lo, hi = summary_stats['numeric_ranges'][explore_col]
+            bin_size = max(1, int((hi - lo) / 50)) if hi > lo else 1
+            fig = plot_numeric_distribution(df[[explore_col]], explore_col, bin_size, mask=mask)
             st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -280,164 +267,63 @@ st.markdown("<h2 class='sub-header'>Key Insights</h2>", unsafe_allow_html=True)
 st.markdown("<div class='metric-container'>", unsafe_allow_html=True)
 
 # Create tabs for different insights
-insight_tab1, insight_tab2, insight_tab3 = st.tabs(["EV Adoption Trends", "Regional Analysis", "Technology Progress"])
+# Switching tabs reruns the script, so only the selected tab's content is sent
+insight_tab1, insight_tab2, insight_tab3 = st.tabs(
+    ["EV Adoption Trends", "Regional Analysis", "Technology Progress"],
+    key="insight_tabs",
+    on_change="rerun"
+)
 
-with insight_tab1:
-    st.subheader("EV Adoption Over Time")
-    
-    # Calculate year-over-year growth
-    yearly_counts = df.groupby('Model Year').size().reset_index(name='Count')
-    yearly_counts['YoY_Growth'] = yearly_counts['Count'].pct_change() * 100
-    
-    # Display growth statistics
-    year_growth_cols = st.columns(2)
-    
-    with year_growth_cols[0]:
-        # Last complete year data
-        max_complete_year = max_year - 1 if max_year == df['Model Year'].max() else max_year
-        latest_year_growth = yearly_counts[yearly_counts['Model Year'] == max_complete_year]['YoY_Growth'].values[0] if len(yearly_counts[yearly_counts['Model Year'] == max_complete_year]) > 0 else 0
+# Insights use the unfiltered data, so they are built once and cached
+insights = build_insights(df)
+
+if insight_tab1.open:
+    with insight_tab1:
+        st.subheader("EV Adoption Over Time")
         
-        growth_color = "green" if latest_year_growth >= 0 else "red"
-        st.markdown(f"<h3 style='text-align: center; color: {growth_color};'>{latest_year_growth:.1f}%</h3>", unsafe_allow_html=True)
-        st.markdown(f"<p style='text-align: center;'>YoY Growth in {max_complete_year}</p>", unsafe_allow_html=True)
-    
-    with year_growth_cols[1]:
-        # Calculate compound annual growth rate over last 5 years
-        last_5_years = yearly_counts[yearly_counts['Model Year'] >= max_year - 5]
-        if len(last_5_years) >= 2:
-            first_year_count = last_5_years.iloc[0]['Count']
-            last_year_count = last_5_years.iloc[-1]['Count']
-            years_diff = last_5_years.iloc[-1]['Model Year'] - last_5_years.iloc[0]['Model Year']
-            if years_diff > 0 and first_year_count > 0:
-                cagr = (((last_year_count / first_year_count) ** (1 / years_diff)) - 1) * 100
-                st.markdown(f"<h3 style='text-align: center; color: green;'>{cagr:.1f}%</h3>", unsafe_allow_html=True)
+        # Display growth statistics
+        year_growth_cols = st.columns(2)
+        
+        with year_growth_cols[0]:
+            latest_year_growth = insights['latest_year_growth']
+            growth_color = "green" if latest_year_growth >= 0 else "red"
+            st.markdown(f"<h3 style='text-align: center; color: {growth_color};'>{latest_year_growth:.1f}%</h3>", unsafe_allow_html=True)
+            st.markdown(f"<p style='text-align: center;'>YoY Growth in {insights['max_complete_year']}</p>", unsafe_allow_html=True)
+        
+        with year_growth_cols[1]:
+            if insights['cagr'] is not None:
+                st.markdown(f"<h3 style='text-align: center; color: green;'>{insights['cagr']:.1f}%</h3>", unsafe_allow_html=True)
                 st.markdown(f"<p style='text-align: center;'>5-Year CAGR</p>", unsafe_allow_html=True)
-    
-    # Display growth chart
-    fig_growth = px.bar(
-        yearly_counts,
-        x='Model Year',
-        y='Count',
-        title='Yearly EV Registrations'
-    )
-    # Add growth rate line on secondary y-axis
-    fig_growth.add_trace(
-        go.Scatter(
-            x=yearly_counts['Model Year'],
-            y=yearly_counts['YoY_Growth'],
-            mode='lines+markers',
-            name='YoY Growth %',
-            yaxis='y2'
-        )
-    )
-    # Update layout for dual y-axis
-    fig_growth.update_layout(
-        yaxis=dict(title='Number of Vehicles'),
-        yaxis2=dict(
-            title='YoY Growth %',
-            overlaying='y',
-            side='right',
-            showgrid=False
-        ),
-        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
-    )
-    st.plotly_chart(fig_growth, use_container_width=True)
+        
+        # Display growth chart
+        st.plotly_chart(insights['fig_growth'], use_container_width=True)
 
-with insight_tab2:
-    st.subheader("Regional Adoption Patterns")
-    
-    # Create columns for regional analysis
-    regional_cols = st.columns(2)
-    
-    with regional_cols[0]:
-        # Top 10 counties bar chart
-        if 'County' in df.columns:
-            county_data = df['County'].value_counts().head(10).reset_index()
-            county_data.columns = ['County', 'Count']
-            
-            fig_counties = px.bar(
-                county_data,
-                y='County',
-                x='Count',
-                orientation='h',
-                color='Count',
-                color_continuous_scale='Viridis',
-                title='Top 10 Counties by EV Adoption'
-            )
-            fig_counties.update_layout(yaxis={'categoryorder': 'total ascending'})
-            st.plotly_chart(fig_counties, use_container_width=True)
-    
-    with regional_cols[1]:
-        # City vs. County analysis
-        if 'City' in df.columns and 'County' in df.columns:
-            # Get top 5 counties
-            top_counties = df['County'].value_counts().head(5).index.tolist()
-            # Filter for those counties
-            county_city_data = df[df['County'].isin(top_counties)]
-            # Group by county and city
-            county_city_counts = county_city_data.groupby(['County', 'City']).size().reset_index(name='Count')
-            # Get top 3 cities per county
-            top_cities_per_county = county_city_counts.sort_values(['County', 'Count'], ascending=[True, False])
-            top_cities_per_county = top_cities_per_county.groupby('County').head(3)
-            
-            fig_county_city = px.bar(
-                top_cities_per_county,
-                x='County',
-                y='Count',
-                color='City',
-                title='Top Cities per County',
-                barmode='group'
-            )
-            st.plotly_chart(fig_county_city, use_container_width=True)
+if insight_tab2.open:
+    with insight_tab2:
+        st.subheader("Regional Adoption Patterns")
+        
+        # Create columns for regional analysis
+        regional_cols = st.columns(2)
+        
+        with regional_cols[0]:
+            # Top 10 counties bar chart
+            if insights['fig_counties'] is not None:
+                st.plotly_chart(insights['fig_counties'], use_container_width=True)
+        
+        with regional_cols[1]:
+            # City vs. County analysis
+            if insights['fig_county_city'] is not None:
+                st.plotly_chart(insights['fig_county_city'], use_container_width=True)
 
-with insight_tab3:
-    st.subheader("EV Technology Advancement")
-    
-    # Calculate average electric range by year
-    range_by_year = df.groupby('Model Year')['Electric Range'].mean().reset_index()
-    range_by_year = range_by_year[range_by_year['Electric Range'] > 0]  # Filter out years with missing data
-    
-    # Create visualization
-    fig_range_trend = px.line(
-        range_by_year,
-        x='Model Year',
-        y='Electric Range',
-        markers=True,
-        title='Average Electric Range by Model Year'
-    )
-    fig_range_trend.update_layout(
-        xaxis_title="Model Year",
-        yaxis_title="Average Range (miles)",
-        hovermode="x unified"
-    )
-    st.plotly_chart(fig_range_trend, use_container_width=True)
-    
-    # BEV vs PHEV comparison if data is available
-    if 'Electric Vehicle Type' in df.columns:
-        # Filter for only rows with valid range data
-        valid_range_df = df[df['Electric Range'] > 0]
-        # Group by type and year
-        type_year_range = valid_range_df.groupby(['Electric Vehicle Type', 'Model Year'])['Electric Range'].mean().reset_index()
-        # Pivot for better plotting
-        ev_type_data = type_year_range.pivot(index='Model Year', columns='Electric Vehicle Type', values='Electric Range').reset_index()
-        ev_type_data = ev_type_data.melt(id_vars=['Model Year'], var_name='EV Type', value_name='Avg Range')
-        ev_type_data = ev_type_data.dropna()
+if insight_tab3.open:
+    with insight_tab3:
+        st.subheader("EV Technology Advancement")
+        
+        st.plotly_chart(insights['fig_range_trend'], use_container_width=True)
         
-        # Create line chart comparing BEV and PHEV ranges
-        fig_type_range = px.line(
-            ev_type_data,
-            x='Model Year',
-            y='Avg Range',
-            color='EV Type',
-            title='BEV vs PHEV: Average Range Comparison',
-            markers=True
-        )
-        fig_type_range.update_layout(
-            xaxis_title="Model Year",
-            yaxis_title="Average Range (miles)",
-            hovermode="x unified"
-        )
-        st.plotly_chart(fig_type_range, use_container_width=True)
+        # BEV vs PHEV comparison if data is available
+        if insights['fig_type_range'] is not None:
+            st.plotly_chart(insights['fig_type_range'], use_container_width=True)
 
 st.markdown("</div>", unsafe_allow_html=True)
 
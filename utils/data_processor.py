@@ -1,39 +1,278 @@
+import csv
+import hashlib
+import io
+import os
+import tempfile
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 import streamlit as st
 
-def load_and_process_data(file):
+# Columns used by the dashboard; everything else is skipped when reading
+NEEDED_COLS = {
+    'Make', 'Model', 'Model Year', 'Electric Range', 'Electric Vehicle Type',
+    'CAFV Eligibility', 'County', 'City', 'State', 'Postal Code'
+}
+
+# Rename columns if they have different names than expected
+# This is to handle potential variations in column naming
+COLUMN_MAPPING = {
+    'Vehicle Make': 'Make',
+    'Vehicle Model': 'Model',
+    'Vehicle Year': 'Model Year',
+    'Electric Vehicle Range': 'Electric Range',
+    'Electric Vehicle Type': 'Electric Vehicle Type',
+    'Clean Alternative Fuel Vehicle Eligibility': 'CAFV Eligibility',
+    'Vehicle Location': 'Location',
+    'Vehicle VIN': 'VIN (1-10)',
+    'DOL Vehicle ID': 'DOL Vehicle ID',
+    'Legislative District': 'Legislative District'
+}
+
+# Low-cardinality text columns stored as categoricals
+CATEGORICAL_COLS = [
+    'Make', 'Model', 'Electric Vehicle Type', 'CAFV Eligibility',
+    'County', 'City', 'State', 'Postal Code'
+]
+
+# Numeric columns parsed straight into 16-bit integers by the CSV reader
+NUMERIC_TYPES = {
+    'Model Year': pa.int16(),
+    'Electric Range': pa.int16()
+}
+
+# Written into the metadata of Parquet copies; bump it whenever the way
+# convert_csv_to_parquet parses the CSV changes, so older copies are rebuilt
+PARQUET_FORMAT_KEY = b'ev_dashboard_format'
+PARQUET_FORMAT_VERSION = b'2'
+
+def _is_needed_column(col):
+    """
+    Check whether a raw column should be read from the data file.
+    
+    Besides the dashboard columns and their known aliases, keep any column
+    that the range and EV type fallbacks in load_and_process_data could pick.
+    
+    Args:
+        col: Raw column name
+        
+    Returns:
+        True if the column should be loaded
+    """
+    lowered = col.lower()
+    return (
+        col in NEEDED_COLS
+        or col in COLUMN_MAPPING
+        or 'range' in lowered
+        or 'type' in lowered
+        or 'category' in lowered
+    )
+
+def _csv_columns(source):
+    """
+    Read the header row of a CSV file.
+    
+    Args:
+        source: Path or binary file-like object of the CSV
+        
+    Returns:
+        List of column names
+    """
+    if isinstance(source, str):
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+    
+    header = source.readline().decode('utf-8-sig')
+    source.seek(0)
+    return next(csv.reader([header]), [])
+
+def _read_csv_table(source):
+    """
+    Read only the needed columns of a CSV file into an Arrow table.
+    
+    Uses PyArrow's multithreaded CSV reader, which converts the numeric and
+    categorical columns while parsing rather than in later pandas passes.
+    
+    Args:
+        source: Path or binary file-like object of the CSV
+        
+    Returns:
+        pyarrow Table
+    """
+    include_columns = [col for col in _csv_columns(source) if _is_needed_column(col)]
+    
+    column_types = {col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLS}
+    numeric_types = dict(NUMERIC_TYPES)
+    numeric_types.update({
+        old_col: NUMERIC_TYPES[new_col] for old_col, new_col in COLUMN_MAPPING.items()
+        if new_col in NUMERIC_TYPES
+    })
+    
+    # Blank text cells are read as missing values, as pd.read_csv does
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=32 << 20)
+    try:
+        table = pacsv.read_csv(
+            source,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                column_types={**column_types, **numeric_types},
+                include_columns=include_columns,
+                strings_can_be_null=True
+            )
+        )
+    except pa.ArrowInvalid:
+        # Dirty numeric values; read them as text and let
+        # load_and_process_data coerce them
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        table = pacsv.read_csv(
+            source,
+            read_options=read_options,
+            convert_options=pacsv.ConvertOptions(
+                column_types=column_types,
+                include_columns=include_columns,
+                strings_can_be_null=True
+            )
+        )
+    
+    return table
+
+def _read_csv(source):
+    """
+    Read only the needed columns of a CSV file.
+    
+    Args:
+        source: Path or binary file-like object of the CSV
+        
+    Returns:
+        Raw pandas DataFrame
+    """
+    return _read_csv_table(source).to_pandas(self_destruct=True)
+
+def convert_csv_to_parquet(csv_path, parquet_path):
+    """
+    Convert a CSV file to a Snappy-compressed Parquet file.
+    
+    The CSV is parsed with the same column types as _read_csv, so frames
+    loaded from the Parquet copy match those parsed from the CSV directly.
+    
+    The file is written under a temporary name and moved into place, so an
+    interrupted or concurrent conversion never leaves a truncated copy at
+    parquet_path.
+    
+    Args:
+        csv_path: Path to the source CSV file
+        parquet_path: Path of the Parquet file to write
+    """
+    table = _read_csv_table(csv_path)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        PARQUET_FORMAT_KEY: PARQUET_FORMAT_VERSION
+    })
+    
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(parquet_path) or '.',
+        prefix=os.path.basename(parquet_path) + '.',
+        suffix='.tmp'
+    )
+    os.close(fd)
+    try:
+        pq.write_table(table, tmp_path, compression='snappy', row_group_size=100_000)
+        os.replace(tmp_path, parquet_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _parquet_is_current(parquet_path, csv_path):
+    """
+    Check whether a Parquet copy of a CSV file can be reused.
+    
+    The copy must be newer than the CSV, readable, and written by the
+    current version of convert_csv_to_parquet; anything else is rebuilt.
+    
+    Args:
+        parquet_path: Path of the Parquet copy
+        csv_path: Path of the source CSV file
+        
+    Returns:
+        True if the Parquet copy is up to date
+    """
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+        return False
+    
+    try:
+        metadata = pq.read_schema(parquet_path).metadata or {}
+    except (pa.ArrowInvalid, OSError):
+        # Truncated or otherwise unreadable copy
+        return False
+    return metadata.get(PARQUET_FORMAT_KEY) == PARQUET_FORMAT_VERSION
+
+def _read_data_file(path):
+    """
+    Read a CSV or Parquet file into a DataFrame.
+    
+    CSV files are converted to a Parquet sibling on first read, which is
+    reused for as long as it is newer than the CSV and in the current format.
+    
+    Args:
+        path: Path to a .csv or .parquet file
+        
+    Returns:
+        Raw pandas DataFrame
+    """
+    if path.endswith('.parquet'):
+        parquet_path = path
+    else:
+        parquet_path = os.path.splitext(path)[0] + '.parquet'
+        if not _parquet_is_current(parquet_path, path):
+            try:
+                convert_csv_to_parquet(path, parquet_path)
+            except OSError:
+                # Read-only deployments can't keep a Parquet copy, so parse the CSV directly
+                return _read_csv(path)
+    
+    # Parquet is columnar, so unused columns are never decoded
+    try:
+        columns = [col for col in pq.read_schema(parquet_path).names if _is_needed_column(col)]
+        return pd.read_parquet(parquet_path, engine='pyarrow', columns=columns)
+    except (pa.ArrowInvalid, OSError):
+        if parquet_path == path:
+            raise
+        # The copy was damaged after it was checked; the CSV is still usable
+        return _read_csv(path)
+
+@st.cache_data(show_spinner=False)
+def load_and_process_data(file, mtime=None):
     """
     Load and process the EV population data.
     
+    Results are cached across Streamlit reruns, keyed on the arguments.
+    
     Args:
-        file: Uploaded file object
+        file: Path to a CSV or Parquet file, or the raw bytes of an uploaded CSV
+        mtime: Modification time of the file at ``file`` so the cache is
+            invalidated when it changes on disk (ignored for bytes)
         
     Returns:
         Processed pandas DataFrame
     """
-    # Load the CSV file
-    df = pd.read_csv(file)
-    
-    # Rename columns if they have different names than expected
-    # This is to handle potential variations in column naming
-    column_mapping = {
-        'Vehicle Make': 'Make',
-        'Vehicle Model': 'Model',
-        'Vehicle Year': 'Model Year',
-        'Electric Vehicle Range': 'Electric Range',
-        'Electric Vehicle Type': 'Electric Vehicle Type',
-        'Clean Alternative Fuel Vehicle Eligibility': 'CAFV Eligibility',
-        'Vehicle Location': 'Location',
-        'Vehicle VIN': 'VIN (1-10)',
-        'DOL Vehicle ID': 'DOL Vehicle ID',
-        'Legislative District': 'Legislative District'
-    }
+    # Load the data file
+    if isinstance(file, bytes):
+        df = _read_csv(io.BytesIO(file))
+        source = hashlib.sha1(file).hexdigest()
+    else:
+        df = _read_data_file(file)
+        source = (file, mtime)
     
-    # Apply column mapping for columns that exist
-    for old_col, new_col in column_mapping.items():
-        if old_col in df.columns and new_col not in df.columns:
-            df.rename(columns={old_col: new_col}, inplace=True)
+    # Apply column mapping for columns that exist, in a single rename
+    renames = {
+        old_col: new_col for old_col, new_col in COLUMN_MAPPING.items()
+        if old_col in df.columns and new_col not in df.columns
+    }
+    if renames:
+        df.rename(columns=renames, inplace=True)
     
     # Check for required columns
     required_columns = ['Make', 'Model', 'Model Year']
@@ -42,48 +281,50 @@ def load_and_process_data(file):
     if missing_columns:
         raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
     
-    # Ensure electric range column exists, create if it doesn't
+    # Look for columns that might hold range or EV type information when
+    # the expected names are missing, and rename them together
+    fallback_renames = {}
     if 'Electric Range' not in df.columns:
-        # Try to find a column that might contain range information
         range_columns = [col for col in df.columns if 'range' in col.lower()]
         if range_columns:
-            df.rename(columns={range_columns[0]: 'Electric Range'}, inplace=True)
-        else:
-            # Create a dummy Electric Range column if it doesn't exist
-            st.warning("Electric Range column not found. Creating a placeholder column.")
-            df['Electric Range'] = np.nan
-    
-    # Clean and convert data types
-    
-    # Convert Model Year to numeric, handling errors
-    df['Model Year'] = pd.to_numeric(df['Model Year'], errors='coerce')
+            fallback_renames[range_columns[0]] = 'Electric Range'
+    if 'Electric Vehicle Type' not in df.columns:
+        type_columns = [
+            col for col in df.columns
+            if ('type' in col.lower() or 'category' in col.lower()) and col not in fallback_renames
+        ]
+        if type_columns:
+            fallback_renames[type_columns[0]] = 'Electric Vehicle Type'
+    if fallback_renames:
+        df.rename(columns=fallback_renames, inplace=True)
     
-    # Convert Electric Range to numeric, handling errors
-    df['Electric Range'] = pd.to_numeric(df['Electric Range'], errors='coerce')
+    # Ensure electric range column exists, create if it doesn't
+    if 'Electric Range' not in df.columns:
+        # Create a dummy Electric Range column if it doesn't exist
+        st.warning("Electric Range column not found. Creating a placeholder column.")
+        df['Electric Range'] = np.nan
     
-    # Fill missing numeric values with appropriate defaults
-    # Using the recommended approach to avoid pandas FutureWarning
-    df = df.copy()  # Create a copy to avoid chained assignment warnings
-    model_year_median = df['Model Year'].median()
-    electric_range_median = df['Electric Range'].median()
+    # Clean and convert data types
     
-    df['Model Year'] = df['Model Year'].fillna(model_year_median)
-    df['Electric Range'] = df['Electric Range'].fillna(electric_range_median)
+    # The readers already produce numeric dtypes; only columns with dirty
+    # values come through as text and need coercing
+    for col in ['Model Year', 'Electric Range']:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
     
-    # Ensure Make and Model are strings
-    df['Make'] = df['Make'].astype(str)
-    df['Model'] = df['Model'].astype(str)
+    # Fill missing numeric values with the (rounded) median and store them
+    # as int16, a quarter of the float64 footprint. A column with no values
+    # at all has no median, so it falls back to 0
+    for col in ['Model Year', 'Electric Range']:
+        median = df[col].median()
+        fill_value = 0 if pd.isna(median) else round(median)
+        df[col] = df[col].fillna(fill_value).round().astype(np.int16)
     
     # Ensure EV type column exists
     if 'Electric Vehicle Type' not in df.columns:
-        # Try to find a column that might contain type information
-        type_columns = [col for col in df.columns if 'type' in col.lower() or 'category' in col.lower()]
-        if type_columns:
-            df.rename(columns={type_columns[0]: 'Electric Vehicle Type'}, inplace=True)
-        else:
-            # Create a dummy EV Type column if it doesn't exist
-            st.warning("Electric Vehicle Type column not found. Creating a placeholder column.")
-            df['Electric Vehicle Type'] = 'Unknown'
+        # Create a dummy EV Type column if it doesn't exist
+        st.warning("Electric Vehicle Type column not found. Creating a placeholder column.")
+        df['Electric Vehicle Type'] = 'Unknown'
     
     # Ensure CAFV eligibility column exists
     if 'CAFV Eligibility' not in df.columns:
@@ -97,8 +338,218 @@ def load_and_process_data(file):
         if col not in df.columns:
             df[col] = 'Unknown'
     
+    # Store text columns as categoricals so counts, groupbys and isin
+    # work on integer codes instead of hashing strings. Categories are kept
+    # sorted so they can be listed directly, e.g. for the make filter
+    for col in CATEGORICAL_COLS:
+        df[col] = df[col].astype('category')
+        categories = df[col].cat.categories
+        if not categories.is_monotonic_increasing:
+            df[col] = df[col].cat.reorder_categories(categories.sort_values())
+    
+    # Remember where the data came from; see frame_key
+    df.attrs['source'] = source
+    
     return df
 
+def frame_key(df):
+    """
+    Build a cheap cache key for a DataFrame.
+    
+    A frame is identified by the data it was loaded from, its columns and its
+    index, so filtered frames get distinct keys without hashing their values.
+    Used as the DataFrame hash function for cached functions.
+    
+    Args:
+        df: DataFrame returned by load_and_process_data, or a subset of it
+        
+    Returns:
+        Hashable tuple identifying the frame
+    """
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        index_key = (index.start, index.stop, index.step)
+    else:
+        index_key = (len(index), int(pd.util.hash_pandas_object(index).sum()))
+    
+    return (df.attrs.get('source'), tuple(df.columns), index_key)
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={pd.DataFrame: frame_key})
+def filter_mask(df, year_range, makes, electric_range):
+    """
+    Select the rows of the EV population data matching the sidebar filters.
+    
+    Returns a mask rather than a filtered copy, so callers only materialize
+    the columns they read. Results are cached so returning to an earlier
+    filter state is a lookup.
+    
+    Args:
+        df: Processed pandas DataFrame
+        year_range: (min, max) model years to keep, inclusive
+        makes: Tuple of manufacturers to keep
+        electric_range: (min, max) electric ranges to keep, inclusive
+        
+    Returns:
+        Boolean numpy array with one entry per row of df
+    """
+    # Combine the conditions in place on the raw arrays
+    model_years = df['Model Year'].to_numpy()
+    electric_ranges = df['Electric Range'].to_numpy()
+    mask = model_years >= year_range[0]
+    mask &= model_years <= year_range[1]
+    mask &= electric_ranges >= electric_range[0]
+    mask &= electric_ranges <= electric_range[1]
+    mask &= df['Make'].isin(makes).to_numpy()
+    
+    return mask
+
+def count_by_year(years):
+    """
+    Count vehicles per model year.
+    
+    Model years are a small integer range, so the counts come from a single
+    np.bincount pass over year offsets rather than hashing every value.
+    
+    Args:
+        years: Model Year Series or array of integers
+        
+    Returns:
+        DataFrame with 'Model Year' and 'Count' columns, one row per model
+        year present, in year order
+    """
+    years = np.asarray(years)
+    if len(years) == 0:
+        return pd.DataFrame({'Model Year': np.array([], dtype=int), 'Count': np.array([], dtype=int)})
+    
+    base = int(years.min())
+    counts = np.bincount(years - base)
+    present = counts > 0
+    
+    return pd.DataFrame({
+        'Model Year': np.arange(base, base + len(counts))[present],
+        'Count': counts[present]
+    })
+
+def aggregate_by_year(df):
+    """
+    Count vehicles and average their electric range per model year.
+    
+    Model years are a small integer range, so both aggregates come from
+    np.bincount over year offsets instead of two sort-based groupbys.
+    
+    Args:
+        df: Processed pandas DataFrame
+        
+    Returns:
+        DataFrame with 'Model Year', 'Count' and 'Electric Range' (mean)
+        columns, one row per model year present in the data
+    """
+    years = df['Model Year'].to_numpy()
+    base = int(years.min())
+    offsets = years - base
+    
+    counts = np.bincount(offsets)
+    range_sums = np.bincount(offsets, weights=df['Electric Range'].to_numpy())
+    present = counts > 0
+    
+    return pd.DataFrame({
+        'Model Year': np.arange(base, base + len(counts))[present],
+        'Count': counts[present],
+        'Electric Range': range_sums[present] / counts[present]
+    })
+
+def top_k_counts(series, k=10):
+    """
+    Count the k most frequent values of a column.
+    
+    Counts the categorical codes with np.bincount and picks the top k with
+    np.partition, so no strings are hashed and only k counts are sorted.
+    Ties are ranked by first appearance, as value_counts does on plain
+    columns.
+    
+    Args:
+        series: Column to count; non-categorical columns are converted first
+        k: Number of values to return
+        
+    Returns:
+        DataFrame with the column's values and a 'Count' column, most
+        frequent first, excluding values that do not occur
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype('category')
+    
+    codes = series.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    
+    # Codes that occur, in order of first appearance, and their counts
+    present = pd.unique(codes)
+    counts = np.bincount(codes, minlength=len(series.cat.categories))[present]
+    k = min(k, len(present))
+    
+    # Everything above the k-th largest count, then the earliest ties with it
+    keep = np.zeros(len(present), dtype=bool)
+    if k:
+        kth = np.partition(counts, -k)[-k]
+        keep = counts > kth
+        keep[np.flatnonzero(counts == kth)[:k - np.count_nonzero(keep)]] = True
+    
+    # Selected positions are in appearance order, so a stable sort keeps ties that way
+    idx = np.flatnonzero(keep)
+    idx = idx[np.argsort(-counts[idx], kind='stable')]
+    
+    return pd.DataFrame({series.name: series.cat.categories[present[idx]], 'Count': counts[idx]})
+
+def top_cities_per_county(df, n_counties=5, n_cities=3):
+    """
+    Count vehicles for the top cities of the top counties.
+    
+    County and city codes are combined into one integer key and counted with
+    a single np.bincount, giving a county x city count matrix whose rows are
+    then reduced to their largest entries.
+    
+    Args:
+        df: Processed pandas DataFrame with categorical County and City columns
+        n_counties: Number of counties, by vehicle count, to include
+        n_cities: Number of cities to keep per county
+        
+    Returns:
+        DataFrame with 'County', 'City' and 'Count' columns, ordered by
+        county name and then by count, most vehicles first
+    """
+    counties = df['County'].cat.categories
+    cities = df['City'].cat.categories
+    county_codes = df['County'].cat.codes.to_numpy()
+    city_codes = df['City'].cat.codes.to_numpy()
+    
+    # Top counties, in category (alphabetical) order
+    top_counties = top_k_counts(df['County'], k=n_counties)['County']
+    top_codes = np.sort(counties.get_indexer(top_counties))
+    
+    # Row of each top county in the count matrix, -1 for the others
+    rows = np.full(len(counties), -1, dtype=np.int64)
+    rows[top_codes] = np.arange(len(top_codes))
+    
+    selected = (county_codes >= 0) & (city_codes >= 0)
+    selected[selected] = rows[county_codes[selected]] >= 0
+    key = rows[county_codes[selected]] * len(cities) + city_codes[selected]
+    counts = np.bincount(key, minlength=len(top_codes) * len(cities)).reshape(len(top_codes), len(cities))
+    
+    k = min(n_cities, len(cities))
+    if k == 0 or len(top_codes) == 0:
+        return pd.DataFrame({'County': [], 'City': [], 'Count': []})
+    
+    # Largest k cities per row; the stable sort ranks tied cities by name
+    top = np.argsort(-counts, axis=1, kind='stable')[:, :k]
+    top_counts = np.take_along_axis(counts, top, axis=1).ravel()
+    
+    result = pd.DataFrame({
+        'County': np.repeat(counties[top_codes], k),
+        'City': cities[top.ravel()],
+        'Count': top_counts
+    })
+    return result[result['Count'] > 0].reset_index(drop=True)
+
+@st.cache_data(show_spinner=False)
 def generate_summary_stats(df):
     """
     Generate summary statistics for the EV population data.
@@ -131,6 +582,17 @@ def generate_summary_stats(df):
     summary['max_year'] = df['Model Year'].max()
     summary['median_year'] = df['Model Year'].median()
     
+    # Min and max of each numeric column, used to size histogram bins. The
+    # predicate matches the one the column explorer uses to pick its numeric
+    # view, so booleans are included; all-missing columns get (0, 0)
+    summary['numeric_ranges'] = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            values = df[col].dropna()
+            summary['numeric_ranges'][col] = (
+                (float(values.min()), float(values.max())) if len(values) else (0.0, 0.0)
+            )
+    
     # Electric Vehicle Type distribution
     if 'Electric Vehicle Type' in df.columns:
         ev_types = df['Electric Vehicle Type'].value_counts().to_dict()
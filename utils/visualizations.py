@@ -1,22 +1,181 @@
-import plotly.express as px
-import plotly.graph_objects as go
+import functools
 import pandas as pd
 import numpy as np
 import re
+import streamlit as st
+from utils.data_processor import frame_key, count_by_year, aggregate_by_year, top_k_counts, top_cities_per_county
 
-def plot_ev_by_make(df):
+# "POINT (lon lat)" coordinates in the Vehicle Location column
+_POINT_RE = re.compile(r'POINT \((-?\d+\.?\d*) (-?\d+\.?\d*)')
+
+# Geographic columns, from most to least detailed
+GEO_LEVELS = ['County', 'City', 'State', 'Postal Code']
+
+# Height and margins shared by the dashboard charts. Passed as layout
+# properties rather than a template, so the active default template
+# (Streamlit's theme in the app) keeps supplying colours and fonts
+_CHART_LAYOUT = dict(height=500, margin=dict(l=40, r=20, t=60, b=40))
+
+# Figures and counts are memoized per frame, which is keyed without hashing its values.
+# Every new filter mask adds an entry, so each function keeps only the most
+# recent ones, matching filter_mask
+_cache_by_frame = st.cache_data(max_entries=32, show_spinner=False, hash_funcs={pd.DataFrame: frame_key})
+
+@functools.cache
+def _plotly():
+    """
+    Import Plotly on first use.
+    
+    Plotly is slow to import, so it is loaded when the first chart is built
+    rather than when this module is imported. Figures are serialized with
+    orjson, which encodes NumPy arrays natively.
+    
+    Returns:
+        Tuple of the plotly.express and plotly.graph_objects modules
+    """
+    import plotly.express as px
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    
+    pio.json.config.default_engine = "orjson"
+    return px, go
+
+def _px():
+    """
+    Get the plotly.express module, importing Plotly on first use.
+    
+    Returns:
+        plotly.express module
+    """
+    return _plotly()[0]
+
+def _go():
+    """
+    Get the plotly.graph_objects module, importing Plotly on first use.
+    
+    Returns:
+        plotly.graph_objects module
+    """
+    return _plotly()[1]
+
+def _column(df, col, mask=None):
+    """
+    Get a column, restricted to the rows selected by an optional mask.
+    
+    Only the requested column is materialized under the mask, rather than
+    a filtered copy of the whole frame.
+    
+    Args:
+        df: Processed pandas DataFrame
+        col: Name of the column
+        mask: Optional boolean array selecting rows of df
+        
+    Returns:
+        pandas Series
+    """
+    series = df[col]
+    return series if mask is None else series[mask]
+
+def _histogram_bar(values, bins):
+    """
+    Bin values with NumPy and return them as a bar trace.
+    
+    Cheaper than px.histogram for a single ungrouped column, which builds
+    a DataFrame and runs its own binning before creating the trace.
+    
+    Args:
+        values: 1-D NumPy array of values to bin
+        bins: Number of equal-width bins
+        
+    Returns:
+        Plotly Bar trace
+    """
+    go = _go()
+    
+    counts, edges = np.histogram(values, bins=bins)
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        marker_color='#1E88E5'
+    )
+
+def _has_multiple_values(series):
+    """
+    Check whether a column holds at least two distinct non-null values.
+    
+    Equivalent to series.nunique() > 1, but compares values (or category
+    codes) against the first one instead of hashing the whole column, and
+    usually answers from the first few rows.
+    
+    Args:
+        series: Column to check
+        
+    Returns:
+        True if the column has more than one distinct value
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.cat.codes.to_numpy()
+        values = values[values >= 0]
+    else:
+        values = series.dropna().to_numpy()
+    
+    if len(values) < 2:
+        return False
+    if (values[:64] != values[0]).any():
+        return True
+    return bool((values != values[0]).any())
+
+@_cache_by_frame
+def _top_counts(df, col, n=None, mask=None):
+    """
+    Count the values of a column, skipping categories with no rows.
+    
+    Cached so that charts counting the same column for the same rows share
+    one value_counts pass across reruns.
+    
+    Args:
+        df: Processed pandas DataFrame
+        col: Name of the column to count
+        n: Number of most frequent values to keep; all if None
+        mask: Optional boolean array selecting the rows to count
+        
+    Returns:
+        pandas DataFrame with the values in column col and their counts in
+        'Count', most frequent first; ties keep their order of first
+        appearance
+    """
+    values = _column(df, col, mask)
+    counts = values.value_counts(sort=False)
+    
+    # Categorical counts come out in category order; put them in order of
+    # first appearance (which also drops unused categories) so ties are
+    # broken the way value_counts does on plain columns
+    counts = counts.reindex(pd.unique(values.dropna()))
+    
+    # nlargest only has to rank the n kept values, not sort every count
+    if n is None:
+        counts = counts.sort_values(ascending=False, kind='stable')
+    else:
+        counts = counts.nlargest(n, keep='first')
+    return pd.DataFrame({col: counts.index, 'Count': counts.to_numpy()})
+
+@_cache_by_frame
+def plot_ev_by_make(df, mask=None):
     """
     Create a bar chart of EVs by manufacturer.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    px = _px()
+    
     # Get top 15 manufacturers by count
-    top_makes = df['Make'].value_counts().head(15).reset_index()
-    top_makes.columns = ['Make', 'Count']
+    top_makes = _top_counts(df, 'Make', 15, mask)
     
     # Create bar chart
     fig = px.bar(
@@ -33,38 +192,34 @@ def plot_ev_by_make(df):
         yaxis={'categoryorder': 'total ascending'},
         xaxis_title="Number of Vehicles",
         yaxis_title="Manufacturer",
-        height=500
+        **_CHART_LAYOUT
     )
     
     return fig
 
-def plot_ev_by_model_year(df):
+@_cache_by_frame
+def plot_ev_by_model_year(df, mask=None):
     """
     Create a line chart of EVs by model year.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
-    # Group by model year
-    year_counts = df.groupby('Model Year').size().reset_index(name='Count')
+    go = _go()
     
-    # Create line chart
-    fig = px.line(
-        year_counts,
-        x='Model Year',
-        y='Count',
-        markers=True,
-        title='EV Adoption by Model Year'
-    )
+    # Count vehicles per model year
+    year_counts = count_by_year(_column(df, 'Model Year', mask))
     
-    # Add area under the line
-    fig.add_trace(
+    # Create line chart with the area under the line filled, as one trace
+    fig = go.Figure(
         go.Scatter(
-            x=year_counts['Model Year'],
-            y=year_counts['Count'],
+            x=year_counts['Model Year'].to_numpy(),
+            y=year_counts['Count'].to_numpy(),
+            mode='lines+markers',
             fill='tozeroy',
             fillcolor='rgba(0, 176, 246, 0.2)',
             line=dict(color='rgba(0, 176, 246, 0.7)'),
@@ -73,10 +228,11 @@ def plot_ev_by_model_year(df):
     )
     
     fig.update_layout(
+        title_text='EV Adoption by Model Year',
         xaxis_title="Model Year",
         yaxis_title="Number of Vehicles",
         showlegend=False,
-        height=500
+        **_CHART_LAYOUT
     )
     
     # Set x-axis to show every year
@@ -87,27 +243,28 @@ def plot_ev_by_model_year(df):
     
     return fig
 
-def plot_ev_by_electric_range(df):
+@_cache_by_frame
+def plot_ev_by_electric_range(df, mask=None):
     """
     Create a histogram of electric range distribution.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    go = _go()
+    
+    ranges = _column(df, 'Electric Range', mask).to_numpy()
+    
     # Create histogram
-    fig = px.histogram(
-        df,
-        x='Electric Range',
-        nbins=30,
-        color_discrete_sequence=['#1E88E5'],
-        title='Distribution of Electric Range (miles)'
-    )
+    fig = go.Figure(_histogram_bar(ranges, bins=30))
+    fig.update_layout(title_text='Distribution of Electric Range (miles)')
     
     # Add vertical line for average
-    avg_range = df['Electric Range'].mean()
+    avg_range = ranges.mean() if len(ranges) else 0.0
     fig.add_vline(
         x=avg_range,
         line_dash="dash",
@@ -119,37 +276,40 @@ def plot_ev_by_electric_range(df):
     fig.update_layout(
         xaxis_title="Electric Range (miles)",
         yaxis_title="Number of Vehicles",
-        height=500
+        uirevision='static',
+        **_CHART_LAYOUT
     )
+    fig.update_traces(hovertemplate='%{x:.0f} miles: %{y} vehicles<extra></extra>')
     
     return fig
 
-def plot_ev_geographical_distribution(df):
+@_cache_by_frame
+def plot_ev_geographical_distribution(df, mask=None):
     """
-    Create a choropleth map of geographical distribution.
+    Create a bar chart of the top locations by EV count.
+    
+    Uses the most detailed of County, City, State and Postal Code that
+    has more than one distinct value.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    px = _px()
+    
     # Check if we have good geographical data
-    if 'County' in df.columns and df['County'].nunique() > 1:
-        geo_level = 'County'
-    elif 'City' in df.columns and df['City'].nunique() > 1:
-        geo_level = 'City'
-    elif 'State' in df.columns and df['State'].nunique() > 1:
-        geo_level = 'State'
-    elif 'Postal Code' in df.columns and df['Postal Code'].nunique() > 1:
-        geo_level = 'Postal Code'
+    for geo_level in GEO_LEVELS:
+        if geo_level in df.columns and _has_multiple_values(_column(df, geo_level, mask)):
+            break
     else:
         # Create a dummy pie chart if no good geo data
-        return _create_dummy_geo_chart(df)
+        return _create_dummy_geo_chart(df, mask)
     
     # Group by the selected geographical level
-    geo_counts = df[geo_level].value_counts().head(15).reset_index()
-    geo_counts.columns = [geo_level, 'Count']
+    geo_counts = _top_counts(df, geo_level, 15, mask)
     
     # Create bar chart
     fig = px.bar(
@@ -166,24 +326,26 @@ def plot_ev_geographical_distribution(df):
         yaxis={'categoryorder': 'total ascending'},
         xaxis_title="Number of Vehicles",
         yaxis_title=geo_level,
-        height=500
+        **_CHART_LAYOUT
     )
     
     return fig
 
-def _create_dummy_geo_chart(df):
+def _create_dummy_geo_chart(df, mask=None):
     """
     Create a dummy chart when geographical data is not available.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    px = _px()
+    
     # Create a simple pie chart of manufacturers
-    top_makes = df['Make'].value_counts().head(10).reset_index()
-    top_makes.columns = ['Make', 'Count']
+    top_makes = _top_counts(df, 'Make', 10, mask)
     
     fig = px.pie(
         top_makes,
@@ -193,28 +355,32 @@ def _create_dummy_geo_chart(df):
     )
     
     fig.update_traces(textposition='inside', textinfo='percent+label')
-    fig.update_layout(height=500)
+    fig.update_layout(**_CHART_LAYOUT)
     
     return fig
 
-def plot_ev_by_electric_type(df):
+@_cache_by_frame
+def plot_ev_by_electric_type(df, mask=None):
     """
     Create a pie chart of EV types (BEV vs PHEV).
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    px = _px()
+    
     # Check if the column exists
     if 'Electric Vehicle Type' not in df.columns:
         # Create a dummy chart
-        return _create_dummy_ev_type_chart(df)
+        return _create_dummy_ev_type_chart(df, mask)
     
     # Group by EV type
-    type_counts = df['Electric Vehicle Type'].value_counts().reset_index()
-    type_counts.columns = ['EV Type', 'Count']
+    type_counts = _top_counts(df, 'Electric Vehicle Type', mask=mask)
+    type_counts = type_counts.rename(columns={'Electric Vehicle Type': 'EV Type'})
     
     # Create pie chart
     fig = px.pie(
@@ -226,22 +392,25 @@ def plot_ev_by_electric_type(df):
     )
     
     fig.update_traces(textposition='inside', textinfo='percent+label')
-    fig.update_layout(height=500)
+    fig.update_layout(**_CHART_LAYOUT)
     
     return fig
 
-def _create_dummy_ev_type_chart(df):
+def _create_dummy_ev_type_chart(df, mask=None):
     """
     Create a dummy chart when EV type data is not available.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    px = _px()
+    
     # Create a simple bar chart of model years
-    year_counts = df.groupby('Model Year').size().reset_index(name='Count')
+    year_counts = count_by_year(_column(df, 'Model Year', mask))
     
     fig = px.bar(
         year_counts,
@@ -254,29 +423,32 @@ def _create_dummy_ev_type_chart(df):
     fig.update_layout(
         xaxis_title="Model Year",
         yaxis_title="Number of Vehicles",
-        height=500
+        **_CHART_LAYOUT
     )
     
     return fig
 
-def plot_ev_by_cafv_eligibility(df):
+@_cache_by_frame
+def plot_ev_by_cafv_eligibility(df, mask=None):
     """
     Create a pie chart of CAFV eligibility.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    px = _px()
+    
     # Check if the column exists
     if 'CAFV Eligibility' not in df.columns:
         # Create a dummy chart
-        return _create_dummy_cafv_chart(df)
+        return _create_dummy_cafv_chart(df, mask)
     
     # Group by CAFV eligibility
-    cafv_counts = df['CAFV Eligibility'].value_counts().reset_index()
-    cafv_counts.columns = ['CAFV Eligibility', 'Count']
+    cafv_counts = _top_counts(df, 'CAFV Eligibility', mask=mask)
     
     # Create pie chart
     fig = px.pie(
@@ -288,37 +460,88 @@ def plot_ev_by_cafv_eligibility(df):
     )
     
     fig.update_traces(textposition='inside', textinfo='percent+label')
-    fig.update_layout(height=500)
+    fig.update_layout(**_CHART_LAYOUT)
     
     return fig
 
-def _create_dummy_cafv_chart(df):
+def _create_dummy_cafv_chart(df, mask=None):
     """
     Create a dummy chart when CAFV data is not available.
     
     Args:
         df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
         
     Returns:
         Plotly figure object
     """
+    go = _go()
+    
     # Create a simple bar chart of electric range distribution
-    fig = px.histogram(
-        df,
-        x='Electric Range',
-        nbins=20,
-        title='Electric Range Distribution (CAFV data not available)',
-        color_discrete_sequence=['#1E88E5']
-    )
+    fig = go.Figure(_histogram_bar(_column(df, 'Electric Range', mask).to_numpy(), bins=20))
     
     fig.update_layout(
+        title_text='Electric Range Distribution (CAFV data not available)',
         xaxis_title="Electric Range (miles)",
         yaxis_title="Number of Vehicles",
-        height=500
+        **_CHART_LAYOUT
     )
     
     return fig
 
+@_cache_by_frame
+def plot_numeric_distribution(df, column, bin_size=None, mask=None):
+    """
+    Create a histogram of a numeric column with a KDE curve overlay.
+    
+    Args:
+        df: Processed pandas DataFrame
+        column: Name of the numeric column to plot
+        bin_size: Width of the histogram bins; 50 automatic bins if None
+        mask: Optional boolean array selecting the rows to plot
+        
+    Returns:
+        Plotly figure object
+    """
+    px = _px()
+    go = _go()
+    
+    # float32 halves the memory traffic of binning and the KDE kernel matrix
+    values = _column(df, column, mask).dropna().to_numpy(dtype=np.float32)
+    
+    # Binning is a single vectorized pass, unlike a full KDE over every row
+    fig = px.histogram(
+        x=values,
+        nbins=50,
+        histnorm='probability density',
+        color_discrete_sequence=['#1E88E5'],
+        labels={'x': column}
+    )
+    if bin_size is not None:
+        fig.update_traces(xbins=dict(size=bin_size))
+    
+    # Estimate the KDE from at most 5,000 points (Scott's rule bandwidth)
+    sample = values
+    if len(sample) > 5000:
+        sample = np.random.default_rng(0).choice(sample, 5000, replace=False)
+    bandwidth = sample.std() * len(sample) ** (-1 / 5) if len(sample) > 1 else 0
+    
+    if bandwidth > 0:
+        xs = np.linspace(values.min(), values.max(), 200, dtype=np.float32)
+        kernel = np.exp(-0.5 * ((xs[:, None] - sample[None, :]) / bandwidth) ** 2)
+        ys = kernel.sum(axis=1) / (len(sample) * bandwidth * np.sqrt(2 * np.pi))
+        fig.add_trace(go.Scattergl(x=xs, y=ys, mode='lines', name='KDE', line=dict(color='red')))
+    
+    fig.update_layout(
+        title_text=f'Distribution of {column}',
+        xaxis_title=column,
+        yaxis_title='Density',
+        showlegend=False
+    )
+    
+    return fig
+
+@_cache_by_frame
 def plot_interactive_geographic_heatmap(df):
     """
     Create an interactive geographic heatmap of EV adoption using lat/long coordinates.
@@ -329,49 +552,248 @@ def plot_interactive_geographic_heatmap(df):
     Returns:
         Plotly figure object
     """
+    go = _go()
+    
     # Extract coordinates from the Vehicle Location column if it exists
     if 'Vehicle Location' not in df.columns:
         # Fallback to a basic geo chart
         return plot_ev_geographical_distribution(df)
     
-    # Extract coordinates using regex pattern
-    coordinates_data = []
-    
-    for loc in df['Vehicle Location']:
-        if pd.isna(loc):
-            continue
-            
-        # Extract coordinates using regex
-        match = re.search(r'POINT \((-?\d+\.?\d*) (-?\d+\.?\d*)', str(loc))
-        if match:
-            lon, lat = float(match.group(1)), float(match.group(2))
-            coordinates_data.append({'lon': lon, 'lat': lat})
-    
-    # Create DataFrame from extracted coordinates
-    if not coordinates_data:
+    # Keep only values that look like 'POINT (...)' so the regex scan skips
+    # missing and malformed rows
+    locations = df['Vehicle Location']
+    if pd.api.types.is_numeric_dtype(locations):
+        return plot_ev_geographical_distribution(df)
+    is_point = locations.str.startswith('POINT', na=False)
+    if not is_point.any():
+        return plot_ev_geographical_distribution(df)
+    
+    # Extract coordinates with a single regex scan over the joined column
+    # rather than one match per row, into contiguous lon and lat arrays
+    points = _POINT_RE.findall('\n'.join(locations[is_point].tolist()))
+    lon, lat = np.array(points, dtype=np.float32).reshape(-1, 2).T.copy()
+    
+    if len(lon) == 0:
         # No valid coordinates found, return fallback
         return plot_ev_geographical_distribution(df)
-        
-    coords_df = pd.DataFrame(coordinates_data)
+    
+    # Aggregate the points into a 200x200 grid so only occupied cells,
+    # weighted by their count, are sent to the browser
+    counts, lon_edges, lat_edges = np.histogram2d(lon, lat, bins=200)
+    lon_idx, lat_idx = np.nonzero(counts)
+    lon_centers = (lon_edges[:-1] + lon_edges[1:]) / 2
+    lat_centers = (lat_edges[:-1] + lat_edges[1:]) / 2
     
     # Create density heatmap
-    fig = px.density_mapbox(
-        coords_df, 
-        lat='lat', 
-        lon='lon', 
+    fig = go.Figure(go.Densitymap(
+        lat=lat_centers[lat_idx].astype(np.float32),
+        lon=lon_centers[lon_idx].astype(np.float32),
+        z=counts[lon_idx, lat_idx].astype(np.int32),
         radius=10,
-        zoom=7,
-        mapbox_style="carto-positron",
-        title="EV Geographic Distribution Heatmap",
-        height=700
+        hovertemplate='%{z} vehicles<extra></extra>'
+    ))
+    
+    # Keep the user's pan and zoom when the figure is re-sent on reruns
+    fig.update_layout(
+        title_text="EV Geographic Distribution Heatmap",
+        uirevision='static',
+        height=700,
+        map=dict(style="carto-positron", zoom=7)
     )
     
     # Improve layout
     fig.update_layout(
-        mapbox=dict(
-            center=dict(lat=coords_df['lat'].mean(), lon=coords_df['lon'].mean()),
+        map=dict(
+            center=dict(lat=float(lat.mean()), lon=float(lon.mean())),
         ),
         margin=dict(l=0, r=0, t=50, b=0)
     )
     
     return fig
+
+# Dashboard charts by name, with the columns each builder reads (including
+# those of its fallback chart); columns missing from the frame are skipped
+_CHARTS = {
+    'make': (plot_ev_by_make, ['Make']),
+    'model_year': (plot_ev_by_model_year, ['Model Year']),
+    'electric_range': (plot_ev_by_electric_range, ['Electric Range']),
+    'ev_type': (plot_ev_by_electric_type, ['Electric Vehicle Type', 'Model Year']),
+    'geo': (plot_ev_geographical_distribution, GEO_LEVELS + ['Make']),
+    'cafv': (plot_ev_by_cafv_eligibility, ['CAFV Eligibility', 'Electric Range']),
+}
+
+def build_all_plots(df, mask=None, names=None):
+    """
+    Build several dashboard charts.
+    
+    Each chart is given only the columns it reads.
+    
+    Args:
+        df: Processed pandas DataFrame
+        mask: Optional boolean array selecting the rows to plot
+        names: Chart names to build ('make', 'model_year', 'electric_range',
+            'ev_type', 'geo', 'cafv'); all if None
+        
+    Returns:
+        Dictionary mapping chart names to Plotly figure objects
+    """
+    figures = {}
+    for name in (_CHARTS if names is None else names):
+        builder, columns = _CHARTS[name]
+        figures[name] = builder(df[[col for col in columns if col in df.columns]], mask)
+    return figures
+
+@_cache_by_frame
+def build_insights(df):
+    """
+    Build the Key Insights statistics and figures.
+    
+    The insights describe the full dataset rather than the filtered view, so
+    they are computed once per dataset and served from the cache on reruns.
+    
+    Args:
+        df: Processed pandas DataFrame (unfiltered)
+        
+    Returns:
+        Dictionary of growth statistics and Plotly figure objects; figures
+        that need a missing column are None
+    """
+    px = _px()
+    go = _go()
+    
+    insights = {}
+    
+    # Per-year counts and average range, shared by the adoption and technology insights
+    year_summary = aggregate_by_year(df)
+    
+    # Calculate year-over-year growth
+    yearly_counts = year_summary[['Model Year', 'Count']].copy()
+    yearly_counts['YoY_Growth'] = yearly_counts['Count'].pct_change() * 100
+    insights['yearly_counts'] = yearly_counts
+    
+    # Last complete year data
+    max_year = int(df['Model Year'].max())
+    max_complete_year = max_year - 1
+    latest = yearly_counts[yearly_counts['Model Year'] == max_complete_year]
+    insights['max_complete_year'] = max_complete_year
+    insights['latest_year_growth'] = latest['YoY_Growth'].values[0] if len(latest) > 0 else 0
+    
+    # Calculate compound annual growth rate over last 5 years
+    insights['cagr'] = None
+    last_5_years = yearly_counts[yearly_counts['Model Year'] >= max_year - 5]
+    if len(last_5_years) >= 2:
+        first_year_count = last_5_years.iloc[0]['Count']
+        last_year_count = last_5_years.iloc[-1]['Count']
+        years_diff = last_5_years.iloc[-1]['Model Year'] - last_5_years.iloc[0]['Model Year']
+        if years_diff > 0 and first_year_count > 0:
+            insights['cagr'] = (((last_year_count / first_year_count) ** (1 / years_diff)) - 1) * 100
+    
+    # Growth chart
+    fig_growth = px.bar(
+        yearly_counts,
+        x='Model Year',
+        y='Count',
+        title='Yearly EV Registrations'
+    )
+    # Add growth rate line on secondary y-axis
+    fig_growth.add_trace(
+        go.Scatter(
+            x=yearly_counts['Model Year'],
+            y=yearly_counts['YoY_Growth'],
+            mode='lines+markers',
+            name='YoY Growth %',
+            yaxis='y2'
+        )
+    )
+    # Update layout for dual y-axis
+    fig_growth.update_layout(
+        yaxis=dict(title='Number of Vehicles'),
+        yaxis2=dict(
+            title='YoY Growth %',
+            overlaying='y',
+            side='right',
+            showgrid=False
+        ),
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1)
+    )
+    insights['fig_growth'] = fig_growth
+    
+    # Top 10 counties bar chart
+    insights['fig_counties'] = None
+    if 'County' in df.columns:
+        county_data = top_k_counts(df['County'], k=10)
+        
+        fig_counties = px.bar(
+            county_data,
+            y='County',
+            x='Count',
+            orientation='h',
+            color='Count',
+            color_continuous_scale='Viridis',
+            title='Top 10 Counties by EV Adoption'
+        )
+        fig_counties.update_layout(yaxis={'categoryorder': 'total ascending'})
+        insights['fig_counties'] = fig_counties
+    
+    # City vs. County analysis
+    insights['fig_county_city'] = None
+    if 'City' in df.columns and 'County' in df.columns:
+        # Top 3 cities in each of the top 5 counties
+        county_city_data = top_cities_per_county(df, n_counties=5, n_cities=3)
+        
+        insights['fig_county_city'] = px.bar(
+            county_city_data,
+            x='County',
+            y='Count',
+            color='City',
+            title='Top Cities per County',
+            barmode='group'
+        )
+    
+    # Calculate average electric range by year
+    range_by_year = year_summary[['Model Year', 'Electric Range']]
+    range_by_year = range_by_year[range_by_year['Electric Range'] > 0]  # Filter out years with missing data
+    
+    fig_range_trend = px.line(
+        range_by_year,
+        x='Model Year',
+        y='Electric Range',
+        markers=True,
+        title='Average Electric Range by Model Year'
+    )
+    fig_range_trend.update_layout(
+        xaxis_title="Model Year",
+        yaxis_title="Average Range (miles)",
+        hovermode="x unified"
+    )
+    insights['fig_range_trend'] = fig_range_trend
+    
+    # BEV vs PHEV comparison if data is available
+    insights['fig_type_range'] = None
+    if 'Electric Vehicle Type' in df.columns:
+        # Filter for only rows with valid range data
+        valid_range_df = df[df['Electric Range'] > 0]
+        # Group by type and year
+        type_year_range = valid_range_df.groupby(['Electric Vehicle Type', 'Model Year'], observed=True)['Electric Range'].mean().reset_index()
+        # Pivot for better plotting
+        ev_type_data = type_year_range.pivot(index='Model Year', columns='Electric Vehicle Type', values='Electric Range').reset_index()
+        ev_type_data = ev_type_data.melt(id_vars=['Model Year'], var_name='EV Type', value_name='Avg Range')
+        ev_type_data = ev_type_data.dropna()
+        
+        # Create line chart comparing BEV and PHEV ranges
+        fig_type_range = px.line(
+            ev_type_data,
+            x='Model Year',
+            y='Avg Range',
+            color='EV Type',
+            title='BEV vs PHEV: Average Range Comparison',
+            markers=True
+        )
+        fig_type_range.update_layout(
+            xaxis_title="Model Year",
+            yaxis_title="Average Range (miles)",
+            hovermode="x unified"
+        )
+        insights['fig_type_range'] = fig_type_range
+    
+    return insights